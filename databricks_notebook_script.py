@@ -11,11 +11,38 @@
 # Import required libraries
 import delta_sharing
 import pandas as pd
+import pyarrow as pa
+import requests
 import json
+
 import os
+import logging
+import logging.handlers
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import traceback
 
+try:
+    import orjson
+
+    def _json_dumps_indented(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+except ImportError:
+    def _json_dumps_indented(obj):
+        return json.dumps(obj, indent=2)
+
+# Hot-path logging: %-style args defer formatting until (and unless) the
+# record is emitted, and the queue keeps discovery/loader threads from
+# contending on the stdout lock
+logger = logging.getLogger("deltashare_notebook")
+if not logger.handlers:
+    _log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+    logger.setLevel(logging.INFO)
+    _log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+    _log_listener.start()
+
 print("✅ Libraries imported successfully")
 print(f"Delta Sharing version: {delta_sharing.__version__}")
 
@@ -44,12 +71,14 @@ print(f"Bearer Token: {'*' * len(DELTA_SHARE_CONFIG['bearerToken'])}")
 def create_profile_file():
     """Create the Delta Share profile file in DBFS"""
     try:
-        # Write profile to DBFS
-        dbutils.fs.put(
-            PROFILE_PATH.replace('/dbfs', ''), 
-            json.dumps(DELTA_SHARE_CONFIG, indent=2), 
-            overwrite=True
-        )
+        # /dbfs is POSIX-mounted, so write the file directly instead of
+        # going through the dbutils.fs.put RPC; write to a temp name and
+        # rename so readers never see a partial profile
+        os.makedirs(os.path.dirname(PROFILE_PATH), exist_ok=True)
+        tmp_path = PROFILE_PATH + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(_json_dumps_indented(DELTA_SHARE_CONFIG))
+        os.replace(tmp_path, PROFILE_PATH)
         print(f"✅ Profile file created at: {PROFILE_PATH}")
         return True
     except Exception as e:
@@ -64,11 +93,42 @@ if create_profile_file():
 # STEP 4: Initialize Delta Share Client
 # ====================================================================
 
+# ====================================================================
+# Metadata caching - avoid repeated listing round-trips on cell re-runs
+# ====================================================================
+
+import time
+
+METADATA_CACHE_TTL_SECONDS = 30
+_metadata_cache = {}
+
+def _cached_call(cache_key, fetch):
+    """Return a cached listing result, refetching after the TTL expires"""
+    now = time.time()
+    entry = _metadata_cache.get(cache_key)
+    if entry and now - entry[0] < METADATA_CACHE_TTL_SECONDS:
+        return entry[1]
+    value = fetch()
+    _metadata_cache[cache_key] = (now, value)
+    return value
+
+def cached_list_shares(client):
+    """client.list_shares() with a short TTL cache"""
+    return _cached_call(('shares',), client.list_shares)
+
+def cached_list_schemas(client, share):
+    """client.list_schemas(share) with a short TTL cache"""
+    return _cached_call(('schemas', share.name), lambda: client.list_schemas(share))
+
+def cached_list_tables(client, schema):
+    """client.list_tables(schema) with a short TTL cache"""
+    return _cached_call(('tables', schema.share, schema.name), lambda: client.list_tables(schema))
+
 def test_connection():
     """Test connection to Delta Share server"""
     try:
         client = delta_sharing.SharingClient(PROFILE_PATH)
-        shares = client.list_shares()
+        shares = cached_list_shares(client)
         print(f"✅ Connection successful! Found {len(shares)} shares")
         return client, shares
     except Exception as e:
@@ -86,62 +146,121 @@ client, shares = test_connection()
 # STEP 5: Data Discovery Functions
 # ====================================================================
 
-def discover_all_tables(client):
-    """Discover all tables across all shares and schemas"""
+def _list_all_tables_fast(share):
+    """List every table in a share with one all-tables round-trip.
+
+    Returns None if the server does not implement the endpoint, so the
+    caller can fall back to the nested schemas/tables walk.
+    """
+    response = requests.get(
+        f"{DELTA_SHARE_CONFIG['endpoint']}/shares/{share.name}/all-tables",
+        headers={'Authorization': f"Bearer {DELTA_SHARE_CONFIG['bearerToken']}"},
+        timeout=10
+    )
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return [
+        {'share': share.name, 'schema': item['schema'], 'table': item['name']}
+        for item in response.json().get('items', [])
+    ]
+
+def _discover_share_tables(client, share):
+    """Discover all tables in one share, returning errors instead of raising"""
+    try:
+        tables = _cached_call(('all-tables', share.name), lambda: _list_all_tables_fast(share))
+        if tables is not None:
+            return share, tables, None
+    except Exception as e:
+        logger.warning("   ⚠️  all-tables endpoint failed for %s (%s), using nested walk", share.name, e)
+
+    # Fallback: walk schemas -> tables with one listing call per schema
+    try:
+        tables = []
+        for schema in cached_list_schemas(client, share):
+            for table in cached_list_tables(client, schema):
+                tables.append({'share': share.name, 'schema': schema.name, 'table': table.name})
+        return share, tables, None
+    except Exception as e:
+        return share, [], e
+
+def discover_all_tables(client, max_workers=16):
+    """Discover all tables across all shares and schemas in parallel"""
     all_tables = []
-    
+
     try:
-        shares = client.list_shares()
+        shares = cached_list_shares(client)
         print(f"\n📊 Discovering tables in {len(shares)} shares...")
-        
-        for share in shares:
-            share_name = share.name
-            print(f"\n🔍 Share: {share_name}")
-            
-            try:
-                schemas = client.list_schemas(share)
-                print(f"   Found {len(schemas)} schemas")
-                
-                for schema in schemas:
-                    schema_name = schema.name
-                    print(f"   📁 Schema: {schema_name}")
-                    
-                    try:
-                        tables = client.list_tables(schema)
-                        print(f"      Found {len(tables)} tables")
-                        
-                        for table in tables:
-                            table_info = {
-                                'share': share_name,
-                                'schema': schema_name,
-                                'table': table.name,
-                                'url': f"{PROFILE_PATH}#{share_name}.{schema_name}.{table.name}"
-                            }
-                            all_tables.append(table_info)
-                            print(f"      📋 Table: {table.name}")
-                            
-                    except Exception as e:
-                        print(f"      ❌ Error listing tables in {schema_name}: {e}")
-                        
-            except Exception as e:
-                print(f"   ❌ Error listing schemas in {share_name}: {e}")
-                
+
+        # One all-tables round-trip per share (nested walk as fallback),
+        # fanned out across a thread pool
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_discover_share_tables, client, share)
+                for share in shares
+            ]
+
+            for future in as_completed(futures):
+                share, tables, error = future.result()
+                logger.info("🔍 Share: %s", share.name)
+                if error:
+                    logger.error("   ❌ Error discovering tables in %s: %s", share.name, error)
+                    continue
+
+                logger.info("   Found %d tables", len(tables))
+                for table_info in tables:
+                    table_info['url'] = (
+                        f"{PROFILE_PATH}#{table_info['share']}.{table_info['schema']}.{table_info['table']}"
+                    )
+                    all_tables.append(table_info)
+                    logger.info("   📋 Table: %s.%s", table_info['schema'], table_info['table'])
+
     except Exception as e:
-        print(f"❌ Error listing shares: {e}")
-    
+        logger.error("❌ Error listing shares: %s", e)
+
     return all_tables
 
-# Discover all available tables
-if client:
-    all_tables = discover_all_tables(client)
-    print(f"\n🎯 Total tables discovered: {len(all_tables)}")
-else:
-    all_tables = []
+# Discovery now runs fused with loading in STEP 7 (discover_and_load_tables),
+# so each share's tables start downloading while other shares are still
+# being listed; discover_all_tables remains for discovery-only use
 
 # ====================================================================
 # STEP 6: Data Loading and Display Functions
 # ====================================================================
 
+def load_as_arrow(url, limit=None):
+    """Load a shared table as a pyarrow Table.
+
+    delta-sharing's public API only returns pandas DataFrames, whose
+    object-dtype string columns can double peak memory. We keep the
+    canonical copy in Arrow and only convert to pandas for display.
+    """
+    df = delta_sharing.load_as_pandas(url, limit=limit)
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+def _to_pandas(table):
+    """Convert a stored table to pandas for display()/describe()"""
+    if isinstance(table, pa.Table):
+        return table.to_pandas()
+    return table
+
+def load_table(table_info, sample_rows=10):
+    """Load a table sample (pure compute, no display side-effects)"""
+    return load_as_arrow(table_info['url'], limit=sample_rows)
+
+def display_table(table, table_info):
+    """Render a loaded table in the notebook UI.
+
+    Kept separate from loading: each display() call serializes the frame
+    over the driver-to-UI bridge, so bulk loading skips it and users
+    display on demand.
+    """
+    print(f"📏 Sample shape: ({table.num_rows}, {table.num_columns})")
+    print(f"🏗️  Columns: {table.column_names}")
+    display(_to_pandas(table))
+    print(f"\n🔧 Data Types:")
+    print(table.schema)
+
 def load_and_display_table(table_info, sample_rows=10, show_full=False):
     """Load and display a Delta Share table as DataFrame"""
     
@@ -149,82 +268,152 @@ def load_and_display_table(table_info, sample_rows=10, show_full=False):
     print(f"\n{'='*60}")
     print(f"📊 TABLE: {table_name}")
     print(f"{'='*60}")
-    
+
     try:
         # Load sample data first
         print(f"Loading sample data ({sample_rows} rows)...")
-        sample_df = delta_sharing.load_as_pandas(table_info['url'], limit=sample_rows)
-        
+        sample_table = load_table(table_info, sample_rows=sample_rows)
+
         print(f"✅ Sample loaded successfully!")
-        print(f"📏 Sample shape: {sample_df.shape}")
-        print(f"🏗️  Columns: {list(sample_df.columns)}")
-        
-        # Display sample data
-        print(f"\n📋 Sample Data (first {min(sample_rows, len(sample_df))} rows):")
-        display(sample_df)
-        
-        # Show data types
-        print(f"\n🔧 Data Types:")
-        print(sample_df.dtypes)
-        
+        display_table(sample_table, table_info)
+
         # Load full table if requested and not too large
         if show_full:
             try:
                 print(f"\n📥 Loading full table...")
-                full_df = delta_sharing.load_as_pandas(table_info['url'])
+                full_table = load_as_arrow(table_info['url'])
                 print(f"✅ Full table loaded!")
-                print(f"📏 Full shape: {full_df.shape}")
-                
+                print(f"📏 Full shape: ({full_table.num_rows}, {full_table.num_columns})")
+
                 # Basic statistics for numeric columns
+                full_df = _to_pandas(full_table)
                 numeric_cols = full_df.select_dtypes(include=['number']).columns
                 if len(numeric_cols) > 0:
                     print(f"\n📈 Numeric Summary:")
                     display(full_df[numeric_cols].describe())
-                
-                return full_df
+
+                return full_table
             except Exception as e:
                 print(f"⚠️  Could not load full table: {e}")
                 print("📋 Returning sample data instead")
-                return sample_df
-        
-        return sample_df
+                return sample_table
+
+        return sample_table
         
     except Exception as e:
         print(f"❌ Error loading table {table_name}: {e}")
         print(f"🔍 Error details: {traceback.format_exc()}")
         return None
 
-def load_all_tables(all_tables, sample_rows=5):
-    """Load all discovered tables as DataFrames"""
-    loaded_tables = {}
-    
-    print(f"\n🚀 Loading all {len(all_tables)} tables...")
-    print(f"📊 Sample size: {sample_rows} rows per table")
-    
-    for i, table_info in enumerate(all_tables, 1):
+def load_all_tables(all_tables, sample_rows=5, max_workers=8, force_reload=False):
+    """Load all discovered tables as DataFrames in parallel"""
+    # Reuse tables already loaded in this session (e.g. on cell re-runs)
+    # instead of refetching identical samples
+    loaded_tables = globals().get('loaded_tables') or {}
+
+    def _needs_load(table_info):
+        if force_reload:
+            return True
         table_key = f"{table_info['share']}.{table_info['schema']}.{table_info['table']}"
-        print(f"\n[{i}/{len(all_tables)}] Processing: {table_key}")
-        
-        df = load_and_display_table(table_info, sample_rows=sample_rows)
-        if df is not None:
-            loaded_tables[table_key] = df
-            print(f"✅ Stored in loaded_tables['{table_key}']")
-        else:
-            print(f"❌ Failed to load {table_key}")
-    
+        cached = loaded_tables.get(table_key)
+        return cached is None or cached.num_rows < sample_rows
+
+    pending = [t for t in all_tables if _needs_load(t)]
+    skipped = len(all_tables) - len(pending)
+
+    print(f"\n🚀 Loading {len(pending)} of {len(all_tables)} tables...")
+    if skipped:
+        print(f"♻️  Reusing {skipped} cached tables (force_reload=True to refetch)")
+    print(f"📊 Sample size: {sample_rows} rows per table")
+
+    # Each load blocks on the sharing server plus the object-store download,
+    # so run them concurrently and report results as they complete
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(load_as_arrow, table_info['url'], limit=sample_rows): table_info
+            for table_info in pending
+        }
+
+        for i, future in enumerate(as_completed(futures), 1):
+            table_info = futures[future]
+            table_key = f"{table_info['share']}.{table_info['schema']}.{table_info['table']}"
+            logger.info("[%d/%d] Completed: %s", i, len(pending), table_key)
+
+            try:
+                table = future.result()
+            except Exception as e:
+                logger.error("❌ Failed to load %s: %s", table_key, e)
+                continue
+
+            loaded_tables[table_key] = table
+            # No display() here - bulk loading stays off the UI bridge;
+            # use explore_table()/display_table() on demand
+            logger.info("📏 Sample shape: (%d, %d)", table.num_rows, table.num_columns)
+            logger.info("✅ Stored in loaded_tables['%s']", table_key)
+
     return loaded_tables
 
+def discover_and_load_tables(client, sample_rows=5, max_workers=16):
+    """Discover shares and load table samples as one fused pipeline.
+
+    Table loads are submitted to the same thread pool as soon as each
+    share's discovery future completes, so discovery round-trips overlap
+    with sample downloads: wall time is roughly max(discovery, loading)
+    instead of their sum.
+    """
+    all_tables = []
+    loaded_tables = globals().get('loaded_tables') or {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        discover_futures = [
+            executor.submit(_discover_share_tables, client, share)
+            for share in cached_list_shares(client)
+        ]
+
+        load_futures = {}
+        for future in as_completed(discover_futures):
+            share, tables, error = future.result()
+            logger.info("🔍 Share: %s", share.name)
+            if error:
+                logger.error("   ❌ Error discovering tables in %s: %s", share.name, error)
+                continue
+
+            logger.info("   Found %d tables", len(tables))
+            for table_info in tables:
+                table_info['url'] = (
+                    f"{PROFILE_PATH}#{table_info['share']}.{table_info['schema']}.{table_info['table']}"
+                )
+                all_tables.append(table_info)
+                table_key = f"{table_info['share']}.{table_info['schema']}.{table_info['table']}"
+                cached = loaded_tables.get(table_key)
+                if cached is not None and cached.num_rows >= sample_rows:
+                    logger.info("   ♻️  Reusing cached %s", table_key)
+                    continue
+                load_futures[executor.submit(load_as_arrow, table_info['url'], limit=sample_rows)] = table_info
+
+        for i, future in enumerate(as_completed(load_futures), 1):
+            table_info = load_futures[future]
+            table_key = f"{table_info['share']}.{table_info['schema']}.{table_info['table']}"
+            try:
+                table = future.result()
+            except Exception as e:
+                logger.error("❌ Failed to load %s: %s", table_key, e)
+                continue
+            loaded_tables[table_key] = table
+            logger.info("[%d/%d] ✅ Loaded %s (%d rows)", i, len(load_futures), table_key, table.num_rows)
+
+    return all_tables, loaded_tables
+
 # ====================================================================
-# STEP 7: Execute Data Loading
+# STEP 7: Execute Data Discovery + Loading (fused)
 # ====================================================================
 
-if all_tables:
-    print(f"\n🎬 Starting data loading process...")
-    print(f"📊 Will load {len(all_tables)} tables with sample data")
-    
-    # Load all tables with small samples first
-    loaded_tables = load_all_tables(all_tables, sample_rows=5)
-    
+if client:
+    print(f"\n🎬 Starting fused discovery + loading...")
+
+    all_tables, loaded_tables = discover_and_load_tables(client, sample_rows=5)
+
+    print(f"\n🎯 Total tables discovered: {len(all_tables)}")
     print(f"\n🎉 DATA LOADING COMPLETE!")
     print(f"✅ Successfully loaded: {len(loaded_tables)} tables")
     print(f"❌ Failed to load: {len(all_tables) - len(loaded_tables)} tables")
@@ -232,11 +421,13 @@ if all_tables:
     # Summary of loaded tables
     print(f"\n📋 LOADED TABLES SUMMARY:")
     print("-" * 60)
-    for table_name, df in loaded_tables.items():
-        print(f"📊 {table_name}: {df.shape[0]} rows × {df.shape[1]} columns")
+    for table_name, table in loaded_tables.items():
+        print(f"📊 {table_name}: {table.num_rows} rows × {table.num_columns} columns")
     
 else:
-    print("❌ No tables discovered. Check your Delta Share server connection.")
+    all_tables = []
+    loaded_tables = {}
+    print("❌ No connection. Check your Delta Share server connection.")
 
 # ====================================================================
 # STEP 8: Utility Functions for Data Exploration
@@ -249,33 +440,37 @@ def explore_table(table_name):
         print(f"Available tables: {list(loaded_tables.keys())}")
         return
     
-    df = loaded_tables[table_name]
+    table = loaded_tables[table_name]
     print(f"\n🔍 DETAILED EXPLORATION: {table_name}")
     print("=" * 60)
-    
-    # Basic info
-    print(f"📏 Shape: {df.shape}")
-    print(f"🧮 Memory usage: {df.memory_usage(deep=True).sum() / 1024:.1f} KB")
-    
-    # Column info
-    print(f"\n📋 Columns ({len(df.columns)}):")
-    for i, col in enumerate(df.columns):
-        print(f"  {i+1:2d}. {col} ({df[col].dtype})")
-    
-    # Missing values
-    missing = df.isnull().sum()
-    if missing.any():
-        print(f"\n❓ Missing Values:")
-        for col, count in missing[missing > 0].items():
-            print(f"  {col}: {count} ({count/len(df)*100:.1f}%)")
-    else:
+
+    # Basic info - Arrow tracks sizes and null counts as metadata,
+    # so none of this rescans the data
+    print(f"📏 Shape: ({table.num_rows}, {table.num_columns})")
+    print(f"🧮 Memory usage: {table.nbytes / 1024:.1f} KB")
+
+    # Column summary - one frame and one render instead of a print per column.
+    # null_count comes from Arrow's null-bitmap metadata, so this never
+    # rescans the data (no pandas isnull() mask allocation)
+    null_counts = [table.column(i).null_count for i in range(table.num_columns)]
+    summary = pd.DataFrame({
+        'column': table.column_names,
+        'dtype': [str(field.type) for field in table.schema],
+        'missing': null_counts,
+        'missing %': [round(count / table.num_rows * 100, 1) if table.num_rows else 0.0
+                      for count in null_counts]
+    })
+    print(f"\n📋 Columns ({table.num_columns}):")
+    display(summary)
+
+    if not any(null_counts):
         print(f"\n✅ No missing values found")
-    
+
     # Show sample data
     print(f"\n📊 Sample Data:")
-    display(df.head(10))
-    
-    return df
+    display(_to_pandas(table.slice(0, 10)))
+
+    return table
 
 def compare_tables():
     """Compare all loaded tables"""
@@ -287,13 +482,16 @@ def compare_tables():
     print("=" * 60)
     
     comparison_data = []
-    for table_name, df in loaded_tables.items():
+    for table_name, table in loaded_tables.items():
+        # nbytes/null_count are Arrow buffer metadata - O(columns), no data
+        # scan, unlike pandas memory_usage(deep=True) which walks every
+        # Python string
         comparison_data.append({
             'Table': table_name,
-            'Rows': df.shape[0],
-            'Columns': df.shape[1],
-            'Memory (KB)': round(df.memory_usage(deep=True).sum() / 1024, 1),
-            'Missing Values': df.isnull().sum().sum()
+            'Rows': table.num_rows,
+            'Columns': table.num_columns,
+            'Memory (KB)': round(table.nbytes / 1024, 1),
+            'Missing Values': sum(col.null_count for col in table.columns)
         })
     
     comparison_df = pd.DataFrame(comparison_data)
@@ -301,7 +499,34 @@ def compare_tables():
     
     return comparison_df
 
-def load_full_table(table_name):
+def iter_full_table(table_info, batch_size=64_000):
+    """Stream a table's data as Arrow RecordBatches.
+
+    Reads the table's parquet files one batch at a time instead of
+    buffering the whole table in RAM, so tables larger than memory can
+    be processed incrementally.
+    """
+    from delta_sharing.protocol import DeltaSharingProfile, Table
+    from delta_sharing.rest_client import DataSharingRestClient
+    import fsspec
+    import pyarrow.parquet as pq
+
+    profile_path, fragment = table_info['url'].split('#')
+    share_name, schema_name, table_name = fragment.split('.')
+
+    profile = DeltaSharingProfile.read_from_file(profile_path)
+    rest_client = DataSharingRestClient(profile)
+    response = rest_client.list_files_in_table(
+        Table(name=table_name, share=share_name, schema=schema_name)
+    )
+
+    for add_file in response.add_files:
+        with fsspec.open(add_file.url, 'rb') as f:
+            parquet_file = pq.ParquetFile(f)
+            for batch in parquet_file.iter_batches(batch_size=batch_size):
+                yield batch
+
+def load_full_table(table_name, batch_size=64_000):
     """Load the complete data for a specific table"""
     # Find the table info
     table_info = None
@@ -309,17 +534,18 @@ def load_full_table(table_name):
         if f"{t['share']}.{t['schema']}.{t['table']}" == table_name:
             table_info = t
             break
-    
+
     if not table_info:
         print(f"❌ Table '{table_name}' not found")
         return None
-    
+
     print(f"📥 Loading full table: {table_name}")
     try:
-        full_df = delta_sharing.load_as_pandas(table_info['url'])
-        print(f"✅ Full table loaded: {full_df.shape}")
-        loaded_tables[table_name] = full_df  # Update the stored version
-        return full_df
+        # Streamed batch-by-batch; only the assembled Arrow table is held
+        full_table = pa.Table.from_batches(iter_full_table(table_info, batch_size=batch_size))
+        print(f"✅ Full table loaded: ({full_table.num_rows}, {full_table.num_columns})")
+        loaded_tables[table_name] = full_table  # Update the stored version
+        return full_table
     except Exception as e:
         print(f"❌ Error loading full table: {e}")
         return None
@@ -334,7 +560,7 @@ print(f"="*80)
 
 if loaded_tables:
     print(f"\n✅ Successfully connected to your Delta Share server!")
-    print(f"📊 Loaded {len(loaded_tables)} tables as pandas DataFrames")
+    print(f"📊 Loaded {len(loaded_tables)} tables as Arrow tables (use _to_pandas() for DataFrames)")
     
     print(f"\n📋 AVAILABLE TABLES:")
     for table_name in loaded_tables.keys():
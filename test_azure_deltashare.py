@@ -5,16 +5,34 @@ This script tests the deployed Azure Container Instances.
 """
 
 import os
-import sys
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+
+    def parse_json(response):
+        """Parse a response body with orjson (native code) when installed"""
+        return orjson.loads(response.content)
+except ImportError:
+    def parse_json(response):
+        return response.json()
 
 # Azure deployment configuration
 AZURE_DELTASHARE_URL = "http://fairgrounds-deltashare-development-deltashare.eastus.azurecontainer.io:8080"
 
+# One session for all probes: keep-alive reuses a single TCP connection
+# across the whole test instead of reconnecting per request
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4,
+                                     max_retries=Retry(total=2, backoff_factor=0.2)))
+
 def get_bearer_token():
     """Get bearer token from environment or prompt"""
-    token = os.getenv('DELTA_SHARING_BEARER_TOKEN')
+    token = os.getenv('DELTA_SHARING_BEARER_TOKEN', '').strip()
     if not token:
         token = input("Enter your Delta Sharing Bearer Token: ").strip()
     return token
@@ -33,15 +51,15 @@ def test_azure_deltashare():
     print(f"Testing server: {AZURE_DELTASHARE_URL}")
     print(f"Bearer token: {'*' * len(bearer_token)}\n")
     
-    headers = {
+    SESSION.headers.update({
         'Authorization': f'Bearer {bearer_token}',
         'Content-Type': 'application/json'
-    }
-    
+    })
+
     try:
         # Test 1: Health check
         print("1. Testing server health...")
-        health_response = requests.get(f"{AZURE_DELTASHARE_URL}/health", timeout=10)
+        health_response = SESSION.get(f"{AZURE_DELTASHARE_URL}/health", timeout=10)
         if health_response.status_code == 200:
             print("   ✅ Server is healthy")
         else:
@@ -49,10 +67,10 @@ def test_azure_deltashare():
         
         # Test 2: List shares
         print("\n2. Listing shares...")
-        shares_response = requests.get(f"{AZURE_DELTASHARE_URL}/shares", headers=headers, timeout=10)
+        shares_response = SESSION.get(f"{AZURE_DELTASHARE_URL}/shares", timeout=10)
         
         if shares_response.status_code == 200:
-            shares_data = shares_response.json()
+            shares_data = parse_json(shares_response)
             shares = shares_data.get('items', [])
             print(f"   ✅ Found {len(shares)} shares:")
             for share in shares:
@@ -62,14 +80,13 @@ def test_azure_deltashare():
                 # Test 3: List schemas in first share
                 share_name = shares[0]['name']
                 print(f"\n3. Listing schemas in '{share_name}'...")
-                schemas_response = requests.get(
+                schemas_response = SESSION.get(
                     f"{AZURE_DELTASHARE_URL}/shares/{share_name}/schemas", 
-                    headers=headers, 
                     timeout=10
                 )
                 
                 if schemas_response.status_code == 200:
-                    schemas_data = schemas_response.json()
+                    schemas_data = parse_json(schemas_response)
                     schemas = schemas_data.get('items', [])
                     print(f"   ✅ Found {len(schemas)} schemas:")
                     for schema in schemas:
@@ -79,45 +96,45 @@ def test_azure_deltashare():
                         # Test 4: List tables in first schema
                         schema_name = schemas[0]['name']
                         print(f"\n4. Listing tables in '{schema_name}'...")
-                        tables_response = requests.get(
+                        tables_response = SESSION.get(
                             f"{AZURE_DELTASHARE_URL}/shares/{share_name}/schemas/{schema_name}/tables", 
-                            headers=headers, 
                             timeout=10
                         )
                         
                         if tables_response.status_code == 200:
-                            tables_data = tables_response.json()
+                            tables_data = parse_json(tables_response)
                             tables = tables_data.get('items', [])
                             print(f"   ✅ Found {len(tables)} tables:")
                             for table in tables:
                                 print(f"      - {table.get('name', 'Unknown')}")
                             
                             if tables:
-                                # Test 5: Get metadata for first table
+                                # Tests 5+6: metadata and query only depend on the
+                                # table name, so issue both requests concurrently
+                                # and overlap the two Azure round-trips
                                 table_name = tables[0]['name']
+                                table_url = f"{AZURE_DELTASHARE_URL}/shares/{share_name}/schemas/{schema_name}/tables/{table_name}"
                                 print(f"\n5. Getting metadata for '{table_name}'...")
-                                metadata_response = requests.get(
-                                    f"{AZURE_DELTASHARE_URL}/shares/{share_name}/schemas/{schema_name}/tables/{table_name}/metadata", 
-                                    headers=headers, 
-                                    timeout=10
-                                )
-                                
+                                with ThreadPoolExecutor(max_workers=2) as pool:
+                                    metadata_future = pool.submit(
+                                        SESSION.get, f"{table_url}/metadata", timeout=10
+                                    )
+                                    query_future = pool.submit(
+                                        SESSION.post, f"{table_url}/query",
+                                        json={"limitHint": 5}, timeout=10
+                                    )
+                                    metadata_response = metadata_future.result()
+                                    query_response = query_future.result()
+
                                 if metadata_response.status_code == 200:
-                                    metadata = metadata_response.json()
+                                    metadata = parse_json(metadata_response)
                                     protocol = metadata.get('protocol', {})
                                     print(f"   ✅ Protocol version: {protocol.get('minReaderVersion', 'Unknown')}")
-                                    
+
                                     # Test 6: Query table
                                     print(f"\n6. Querying '{table_name}' (limit 5)...")
-                                    query_response = requests.post(
-                                        f"{AZURE_DELTASHARE_URL}/shares/{share_name}/schemas/{schema_name}/tables/{table_name}/query", 
-                                        headers=headers,
-                                        json={"limitHint": 5},
-                                        timeout=10
-                                    )
-                                    
                                     if query_response.status_code == 200:
-                                        query_data = query_response.json()
+                                        query_data = parse_json(query_response)
                                         files = query_data.get('files', [])
                                         print(f"   ✅ Query returned {len(files)} file(s)")
                                         if files:
@@ -149,4 +166,4 @@ def test_azure_deltashare():
 
 if __name__ == "__main__":
     success = test_azure_deltashare()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    raise SystemExit(0 if success else 1)
\ No newline at end of file